@@ -0,0 +1,355 @@
+# Benchmark and load test for the E-commerce API
+
+# Seeds a local database with a configurable number of customers, products and orders, then drives the real endpoints,
+# either in-process through the Flask test client or over HTTP with concurrent clients against a running server.
+# For every endpoint it reports throughput, p50/p95/p99 latency and SQL statements per request, and writes the results
+# as JSON so that a run can be compared against a stored baseline.
+
+# Usage:
+#   python benchmark.py seed --customers 1000 --products 5000 --orders 20000
+#   python benchmark.py run --requests 500 --output results.json
+#   python benchmark.py run --requests 500 --baseline baseline.json          (exits with 1 on a regression)
+#   python benchmark.py run --url http://127.0.0.1:5000 --concurrency 32     (HTTP mode, start the server with PROFILING=true to get statement counts)
+#   python benchmark.py signups --threads 1,2,4,8 --seconds 10              (sustained POST /accounts throughput, i.e. password hashing)
+#   python benchmark.py cold-start --workers 8                               (time until a new worker process answers its first request)
+
+# The database is DATABASE_URL, or a SQLite file benchmark.db next to this script when it isn't set.
+# seed drops all tables first, so it only seeds a database that isn't SQLite with --force.
+
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark.db"))
+
+import e_commerce_api_orm as api
+from sqlalchemy import event, func, insert, select
+
+
+SEED_CHUNK_SIZE = 5000
+
+def seed(customers, products, orders, max_lines, random_seed):
+    rng = random.Random(random_seed)
+    with api.app.app_context():
+        api.db.drop_all()
+        api.upgrade_schema(api.db.engine)
+        with api.db.engine.begin() as connection:
+            for start in range(0, customers, SEED_CHUNK_SIZE):
+                connection.execute(insert(api.Customer), [
+                    {"name": f"Customer {i}", "email": f"customer{i}@example.com", "phone": f"+1555{i:07d}"}
+                    for i in range(start, min(start + SEED_CHUNK_SIZE, customers))
+                ])
+            prices = [round(rng.uniform(1, 500), 2) for _ in range(products)]
+            for start in range(0, products, SEED_CHUNK_SIZE):
+                connection.execute(insert(api.Product), [
+                    {"name": f"Product {i} {rng.choice(['Shoes', 'Shirt', 'Lamp', 'Phone', 'Chair', 'Book'])}", "price": prices[i], "stock_level": 1_000_000}
+                    for i in range(start, min(start + SEED_CHUNK_SIZE, products))
+                ])
+            start_date = datetime.date(2023, 1, 1)
+            for start in range(0, orders, SEED_CHUNK_SIZE):
+                batch = range(start + 1, min(start + SEED_CHUNK_SIZE, orders) + 1)
+                connection.execute(insert(api.Order), [
+                    {"order_id": order_id, "customer_id": rng.randint(1, customers), "date": start_date + datetime.timedelta(days=rng.randint(0, 700)),
+                     "status": rng.choice(['pending', 'shipped', 'completed', 'canceled'])}
+                    for order_id in batch
+                ])
+                lines = []
+                for order_id in batch:
+                    for product_id in rng.sample(range(1, products + 1), rng.randint(1, max_lines)):
+                        lines.append({"order_id": order_id, "product_id": product_id, "quantity": rng.randint(1, 3), "unit_price": prices[product_id - 1]})
+                connection.execute(insert(api.order_product), lines)
+    print(f"Seeded {customers} customers, {products} products and {orders} orders into {os.environ['DATABASE_URL']}")
+
+
+def scenarios(rng, counts):
+    # (name, method, path factory, body factory) for every benchmarked endpoint
+    customer = lambda: rng.randint(1, counts["customers"])
+    product = lambda: rng.randint(1, counts["products"])
+    order = lambda: rng.randint(1, counts["orders"])
+    return [
+        ("GET /products", "GET", lambda: "/products?limit=50", None),
+        ("GET /products/<id>", "GET", lambda: f"/products/{product()}", None),
+        ("GET /products/by-name", "GET", lambda: f"/products/by-name?name={rng.choice(['shoe', 'shirt', 'lamp', 'phon', 'chiar'])}&limit=20", None),
+        ("GET /customers", "GET", lambda: "/customers?limit=50", None),
+        ("GET /orders", "GET", lambda: "/orders?limit=50", None),
+        ("GET /products?ids= x50", "GET", lambda: f"/products?ids={','.join(str(product()) for _ in range(50))}", None),
+        ("GET /orders/<id>", "GET", lambda: f"/orders/{order()}", None),
+        ("POST /orders/batch x20", "POST", lambda: "/orders/batch", lambda: {"ids": [order() for _ in range(20)]}),
+        ("GET /orders/<id>/total", "GET", lambda: f"/orders/{order()}/total", None),
+        ("GET /customers/<id>/orders", "GET", lambda: f"/customers/{customer()}/orders", None),
+        ("POST /orders", "POST", lambda: "/orders",
+         lambda: {"customer_id": customer(), "date": "2024-06-25", "product_ids": [product() for _ in range(rng.randint(1, 4))]}),
+    ]
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))]
+
+def summarize(latencies, elapsed, errors, statements):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies), "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3), "p95_ms": round(percentile(latencies, 0.95), 3), "p99_ms": round(percentile(latencies, 0.99), 3),
+        "avg_statements": round(sum(statements) / len(statements), 2) if statements else None,
+    }
+
+def run_in_process(requests, random_seed, counts):
+    # Drives the endpoints through the Flask test client, counting SQL statements with an engine event
+    rng = random.Random(random_seed)
+    client = api.app.test_client()
+    statement_count = [0]
+    with api.app.app_context():
+        event.listen(api.db.engine, "before_cursor_execute", lambda *args: statement_count.__setitem__(0, statement_count[0] + 1))
+
+    results = {}
+    for name, method, path, body in scenarios(rng, counts):
+        latencies, statements, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            statement_count[0] = 0
+            request_start = time.perf_counter()
+            response = client.open(path(), method=method, json=body() if body else None)
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            statements.append(statement_count[0])
+            errors += response.status_code >= 500
+        results[name] = summarize(latencies, time.perf_counter() - started, errors, statements)
+    return results
+
+def http_request(base_url, method, path, body):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            status, server_timing = response.status, response.headers.get("Server-Timing", "")
+    except urllib.error.HTTPError as err:
+        status, server_timing = err.code, err.headers.get("Server-Timing", "")
+    except OSError:
+        status, server_timing = 599, ""
+    statements = None
+    if 'statements' in server_timing: # Sent by the server when it runs with PROFILING=true
+        statements = int(server_timing.split('desc="')[1].split(" statements")[0])
+    return (time.perf_counter() - start) * 1000, status, statements
+
+def run_over_http(base_url, requests, concurrency, random_seed, counts):
+    # Drives a running server with concurrent clients
+    rng = random.Random(random_seed)
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for name, method, path, body in scenarios(rng, counts):
+            calls = [(method, path(), body() if body else None) for _ in range(requests)] # Generated up front so that runs are reproducible
+            started = time.perf_counter()
+            responses = list(executor.map(lambda call: http_request(base_url, *call), calls))
+            elapsed = time.perf_counter() - started
+            statements = [count for _, _, count in responses if count is not None]
+            results[name] = summarize([latency for latency, _, _ in responses], elapsed, sum(status >= 500 for _, status, _ in responses), statements)
+    return results
+
+
+def run_signups(thread_counts, seconds, counts):
+    # Sustained POST /accounts throughput with 1..N concurrent clients. Each signup hashes a password in the app's bounded hashing pool,
+    # so signups per second should grow with the clients up to PASSWORD_HASH_WORKERS (one per core by default)
+    run_id = int(time.time())
+    results = {}
+    for threads in thread_counts:
+        latencies, statuses = [], []
+        deadline = time.perf_counter() + seconds
+
+        def client_loop(thread_index):
+            client = api.app.test_client()
+            rng = random.Random(thread_index)
+            sequence = 0
+            while time.perf_counter() < deadline:
+                sequence += 1
+                body = {"customer_id": rng.randint(1, counts["customers"]), "username": f"u{run_id}t{threads}x{thread_index}n{sequence}", "password": "Benchmark1!"}
+                start = time.perf_counter()
+                status = client.post("/accounts", json=body).status_code
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses.append(status)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(client_loop, range(threads)))
+        elapsed = time.perf_counter() - started
+        stats = summarize(latencies, elapsed, sum(status >= 500 and status != 503 for status in statuses), [])
+        stats["signups_per_second"] = round(sum(status == 201 for status in statuses) / elapsed, 2)
+        stats["rejected_busy"] = sum(status == 503 for status in statuses)
+        results[f"{threads} clients"] = stats
+    return results
+
+
+COLD_START_SCRIPT = """
+import sys
+import e_commerce_api_orm as api
+if sys.argv[1] == "upgrade":
+    with api.app.app_context():
+        api.upgrade_schema(api.db.engine)
+api.prepare_app(start_jobs=False).test_client().get("/products?limit=1")
+"""
+
+def run_cold_start(workers):
+    # Time from starting a worker process until it has answered GET /products: a new interpreter that imports the app,
+    # with and without the schema upgrade that used to run on import, against a worker forked from this already imported
+    # process like gunicorn's preload_app does (see gunicorn.conf.py)
+    results = {}
+    for name, mode in (("spawn + schema upgrade", "upgrade"), ("spawn", "import")):
+        timings = []
+        for _ in range(workers):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", COLD_START_SCRIPT, mode], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = timings
+
+    timings = []
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            api.init_worker()
+            api.app.test_client().get("/products?limit=1")
+            os.write(write_end, str((time.perf_counter() - start) * 1000).encode())
+            os._exit(0)
+        os.close(write_end)
+        with os.fdopen(read_end) as pipe:
+            timings.append(float(pipe.read()))
+        os.waitpid(pid, 0)
+    results["fork after preload"] = timings
+
+    return {name: {"workers": len(timings), "mean_ms": round(sum(timings) / len(timings), 2), "p50_ms": round(percentile(sorted(timings), 0.5), 2),
+                   "max_ms": round(max(timings), 2)} for name, timings in results.items()}
+
+
+def compare(results, baseline, tolerance):
+    # Returns the regressions: p95 latency above, or throughput below, the baseline by more than the tolerance
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(name)
+        if current is None:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} ms -> {current['p95_ms']} ms")
+        if base["throughput_rps"] and current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+    return regressions
+
+def print_table(results):
+    print(f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+    for name, stats in results["endpoints"].items():
+        queries = "-" if stats["avg_statements"] is None else stats["avg_statements"]
+        print(f"{name:<28}{stats['throughput_rps']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{queries:>9}{stats['errors']:>8}")
+
+def row_counts():
+    with api.app.app_context():
+        return {
+            "customers": api.db.session.scalar(select(func.count()).select_from(api.Customer)),
+            "products": api.db.session.scalar(select(func.count()).select_from(api.Product)),
+            "orders": api.db.session.scalar(select(func.count()).select_from(api.Order)),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the E-commerce API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Recreate the database with generated data")
+    seed_parser.add_argument("--customers", type=int, default=1000)
+    seed_parser.add_argument("--products", type=int, default=5000)
+    seed_parser.add_argument("--orders", type=int, default=20000)
+    seed_parser.add_argument("--max-lines", type=int, default=5, help="Maximum number of products per order")
+    seed_parser.add_argument("--seed", type=int, default=42)
+    seed_parser.add_argument("--force", action="store_true", help="Seed a database that isn't SQLite, dropping all of its tables")
+
+    run_parser = commands.add_parser("run", help="Benchmark the endpoints")
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    run_parser.add_argument("--url", help="Benchmark a running server over HTTP instead of the in-process test client")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrent HTTP clients (HTTP mode only)")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", help="Write the results as JSON to this file")
+    run_parser.add_argument("--baseline", help="Compare against the results JSON of an earlier run")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline (0.2 = 20%%)")
+
+    signups_parser = commands.add_parser("signups", help="Measure sustained signups (password hashing) per second")
+    signups_parser.add_argument("--threads", default=f"1,{os.cpu_count() or 1}", help="Comma-separated numbers of concurrent clients")
+    signups_parser.add_argument("--seconds", type=float, default=10, help="Duration of each run")
+    signups_parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    cold_start_parser = commands.add_parser("cold-start", help="Measure how long a new worker process takes to answer its first request")
+    cold_start_parser.add_argument("--workers", type=int, default=4, help="Worker processes started per startup mode")
+    cold_start_parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        if not api.app.config['SQLALCHEMY_DATABASE_URI'].startswith("sqlite") and not args.force:
+            # DATABASE_URL may still point at a real database exported in the shell
+            print("Refusing to drop the tables of a database that isn't SQLite, pass --force to seed it anyway", file=sys.stderr)
+            return 2
+        seed(args.customers, args.products, args.orders, args.max_lines, args.seed)
+        return 0
+
+    counts = row_counts()
+    if not counts["orders"]:
+        print("The database is empty, run: python benchmark.py seed", file=sys.stderr)
+        return 2
+    if args.command == "signups":
+        endpoints = run_signups([int(threads) for threads in args.threads.split(",")], args.seconds, counts)
+        results = {"mode": "signups", "cpu_count": os.cpu_count(), "password_hash_method": api.app.config['PASSWORD_HASH_METHOD'],
+                   "password_hash_workers": api.app.config['PASSWORD_HASH_WORKERS'], "database": counts, "endpoints": endpoints}
+        print(f"{'clients':<12}{'signups/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'503s':>7}")
+        for name, stats in endpoints.items():
+            print(f"{name:<12}{stats['signups_per_second']:>11}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['rejected_busy']:>7}")
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=2)
+        return 0
+    if args.command == "cold-start":
+        endpoints = run_cold_start(args.workers)
+        results = {"mode": "cold-start", "python": sys.version.split()[0], "database": counts, "endpoints": endpoints}
+        print(f"{'startup':<26}{'workers':>9}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}")
+        for name, stats in endpoints.items():
+            print(f"{name:<26}{stats['workers']:>9}{stats['mean_ms']:>10}{stats['p50_ms']:>10}{stats['max_ms']:>10}")
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=2)
+        return 0
+    if args.url:
+        endpoints = run_over_http(args.url.rstrip("/"), args.requests, args.concurrency, args.seed, counts)
+    else:
+        endpoints = run_in_process(args.requests, args.seed, counts)
+
+    results = {
+        "mode": "http" if args.url else "test_client", "concurrency": args.concurrency if args.url else 1,
+        "requests_per_endpoint": args.requests, "database": counts, "python": sys.version.split()[0],
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), "endpoints": endpoints
+    }
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
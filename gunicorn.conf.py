@@ -0,0 +1,27 @@
+# Production server for the E-commerce API
+
+# Run it with:
+#   flask --app e_commerce_api_orm db-upgrade   (the schema is no longer created when the app starts)
+#   gunicorn -c gunicorn.conf.py
+
+# The master process imports the app once (preload_app) and forks the workers from it, so a new or restarted worker
+# doesn't import Flask, SQLAlchemy and the models again. Each worker then opens its own connection pool and starts
+# its own background jobs in post_fork (see SERVING PROCESSES in e_commerce_api_orm.py).
+
+import multiprocessing
+import os
+
+wsgi_app = "e_commerce_api_orm:prepare_app(start_jobs=False)" # The jobs are started per worker, in post_fork
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Requests are served by a thread pool in each worker. Keep the threads at or below DB_POOL_SIZE + DB_MAX_OVERFLOW,
+# so that a request never waits for a connection
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+accesslog = "-"
+
+def post_fork(server, worker):
+    import e_commerce_api_orm
+    e_commerce_api_orm.init_worker(server.cfg.workers)
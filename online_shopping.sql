@@ -4,4 +4,6 @@ USE online_shopping;
 
 ALTER TABLE Products ADD COLUMN stock_level INT NOT NULL DEFAULT 0;
 
-ALTER TABLE Orders ADD COLUMN status VARCHAR(50) NOT NULL DEFAULT 'pending';
\ No newline at end of file
+ALTER TABLE Orders ADD COLUMN status VARCHAR(50) NOT NULL DEFAULT 'pending';
+
+-- Later schema changes are applied by the versioned migrations: flask --app e_commerce_api_orm db-upgrade
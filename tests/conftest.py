@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The tests run against a SQLite file of their own, set before the app is imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("PROFILING", "true") # Registered at import, so that its hooks and headers can be tested
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import e_commerce_api_orm as api
+
+
+@pytest.fixture
+def app():
+    # A new schema for every test
+    with api.app.app_context():
+        api.db.drop_all()
+        api.upgrade_schema(api.db.engine)
+    api.catalog_cache.store = api.MemoryCache() # Nothing cached from an earlier test's database
+    for index in (api.product_search, api.customer_search):
+        index.built_at = None # Built again from this test's database by the first search
+    yield api.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
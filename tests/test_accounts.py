@@ -0,0 +1,70 @@
+from sqlalchemy import insert, select
+
+import e_commerce_api_orm as api
+
+ACCOUNT = {"customer_id": 1, "username": "user123", "password": "Password1@"}
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+
+
+def test_passwords_are_hashed_outside_the_transaction(app, client, monkeypatch):
+    seed()
+    hash_password = api.password_hasher.hash
+    in_transaction = []
+
+    def hash_outside_transaction(password):
+        in_transaction.append(api.db.session().in_transaction())
+        return hash_password(password)
+
+    monkeypatch.setattr(api.password_hasher, "hash", hash_outside_transaction)
+    assert client.post("/accounts", json=ACCOUNT).status_code == 201
+    assert client.put("/accounts/1", json={**ACCOUNT, "password": "NewPassword1@"}).status_code == 200
+    assert in_transaction == [False, False]
+    assert client.put("/accounts/2", json=ACCOUNT).status_code == 404
+
+
+def stored_password():
+    with api.app.app_context():
+        return api.db.session.scalar(select(api.CustomerAccount.password))
+
+
+def test_passwords_are_stored_hashed_and_never_returned(app, client):
+    seed()
+    client.post("/accounts", json=ACCOUNT)
+    assert stored_password().startswith(api.password_hasher.method + "$")
+    assert "password" not in client.get("/accounts").get_json()["data"][0]
+
+
+def test_login(app, client):
+    seed()
+    client.post("/accounts", json=ACCOUNT)
+    assert client.post("/accounts/login", json={"username": "user123", "password": "Password1@"}).get_json() == {
+        "message": "Login successful", "account_id": 1, "customer_id": 1}
+    assert client.post("/accounts/login", json={"username": "user123", "password": "Wrong1@pass"}).status_code == 401
+    assert client.post("/accounts/login", json={"username": "nobody", "password": "Password1@"}).status_code == 401
+    assert client.post("/accounts/login", json={"username": "user123"}).status_code == 400
+
+
+def test_login_upgrades_hashes_of_an_old_method(app, client):
+    seed()
+    with app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.CustomerAccount), [{**ACCOUNT, "password": api.generate_password_hash(ACCOUNT["password"], "pbkdf2:sha256:1000")}])
+    assert client.post("/accounts/login", json={"username": "user123", "password": "Password1@"}).status_code == 200
+    assert stored_password().startswith(api.password_hasher.method + "$")
+    assert client.post("/accounts/login", json={"username": "user123", "password": "Password1@"}).status_code == 200
+
+
+def test_a_full_hashing_queue_answers_503(app, client, monkeypatch):
+    seed()
+    hasher = api.PasswordHasher(api.password_hasher.method, workers=1, queue_size=0)
+    monkeypatch.setattr(api, "password_hasher", hasher)
+    assert hasher.slots.acquire(blocking=False) # The only slot is taken by another request
+    response = client.post("/accounts", json=ACCOUNT)
+    assert (response.status_code, response.headers["Retry-After"]) == (503, "1")
+    hasher.slots.release()
+    assert client.post("/accounts", json=ACCOUNT).status_code == 201
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+pytest.importorskip("aiosqlite")
+testclient = pytest.importorskip("starlette.testclient")
+async_api = pytest.importorskip("e_commerce_api_async")
+
+
+@pytest.fixture
+def async_client(app):
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 3}])
+    with testclient.TestClient(async_api.app) as client:
+        yield client
+
+
+def stock_level(client):
+    return client.get("/products/1/stock").json()["stock_level"]
+
+
+def place_order(client, quantity):
+    response = client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": [1] * quantity})
+    assert response.status_code == 201
+    return client.get("/customers/1/orders").json()[-1]["order_id"]
+
+
+def test_placing_an_order_takes_its_stock(async_client):
+    order_id = place_order(async_client, 2)
+    assert stock_level(async_client) == 1
+    assert async_client.get(f"/orders/{order_id}/total").json()["total_price"] == 20.0
+    response = async_client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": [1, 1]})
+    assert response.status_code == 409
+    assert stock_level(async_client) == 1
+
+
+def test_canceling_an_order_gives_its_stock_back_and_updates_the_summary(async_client):
+    order_id = place_order(async_client, 2)
+    assert async_client.put(f"/orders/{order_id}/cancel").status_code == 200
+    assert stock_level(async_client) == 3
+    summary = async_client.get("/customers/1/summary").json()
+    assert (summary["order_count"], summary["total_spent"]) == (0, 0.0)
+
+
+def test_deleting_an_order_gives_back_only_open_stock(async_client):
+    order_id = place_order(async_client, 2)
+    assert async_client.delete(f"/orders/{order_id}").status_code == 200
+    assert stock_level(async_client) == 3
+    assert async_client.get(f"/orders/{order_id}").status_code == 404
+
+    order_id = place_order(async_client, 2)
+    body = {"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}
+    assert async_client.put(f"/orders/{order_id}", json={**body, "status": "completed"}).status_code == 200
+    assert async_client.delete(f"/orders/{order_id}").status_code == 200
+    assert stock_level(async_client) == 1
+
+
+def test_account_updates_hash_the_new_password(async_client):
+    account = {"customer_id": 1, "username": "user123", "password": "Password1@"}
+    assert async_client.post("/accounts", json=account).status_code == 201
+    assert async_client.put("/accounts/1", json={**account, "password": "NewPassword1@"}).status_code == 200
+    assert async_client.post("/accounts/login", json={"username": "user123", "password": "NewPassword1@"}).status_code == 200
+    assert async_client.put("/accounts/2", json=account).status_code == 404
@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": product_id, "name": f"Product {product_id}", "price": 1.0, "stock_level": 1}
+                                                     for product_id in range(1, 8)])
+            connection.execute(insert(api.Order), [{"order_id": order_id, "customer_id": 1, "date": datetime.date(2024, 6, 25), "status": "pending"}
+                                                   for order_id in (1, 2)])
+            connection.execute(insert(api.order_product), [{"order_id": 1, "product_id": product_id, "quantity": 1, "unit_price": 1.0} for product_id in (3, 5)])
+
+
+def test_rows_come_in_request_order_with_the_missing_ids(app, client):
+    seed()
+    body = client.get("/products?ids=5,99,2,5,7").get_json()
+    assert [product["product_id"] for product in body["data"]] == [5, 2, 7]
+    assert body["missing"] == [99]
+    assert client.post("/products/batch", json={"ids": [5, 99, 2, 5, 7]}).get_json() == body
+
+
+def test_rows_match_the_list_format(app, client):
+    seed()
+    listed = client.get("/products?limit=3").get_json()["data"]
+    assert client.get("/products?ids=1,2,3").get_json()["data"] == listed
+    assert client.get("/products?ids=2&fields=name").get_json()["data"] == [{"name": "Product 2"}]
+    orders = client.post("/orders/batch", json={"ids": [2, 1]}).get_json()["data"]
+    assert [(order["order_id"], order["products"]) for order in orders] == [(2, []), (1, [{"product_id": 3}, {"product_id": 5}])]
+    assert client.post("/customers/batch", json={"ids": [1]}).get_json()["data"] == client.get("/customers").get_json()["data"]
+
+
+def test_ids_are_read_in_chunks(app, client, monkeypatch):
+    seed()
+    in_chunks = api.in_chunks
+    monkeypatch.setattr(api, "in_chunks", lambda ids: in_chunks(ids, size=2))
+    body = client.post("/products/batch", json={"ids": list(range(7, 0, -1))}).get_json()
+    assert [product["product_id"] for product in body["data"]] == list(range(7, 0, -1))
+
+
+@pytest.mark.parametrize("request_args", [
+    ("get", "/products?ids=1,x"),
+    ("get", "/products?ids=,"),
+    ("post", "/products/batch", {"ids": []}),
+    ("post", "/products/batch", {"ids": list(range(api.MAX_BATCH_IDS + 1))}),
+    ("post", "/orders/batch", {}),
+])
+def test_bad_id_lists_are_rejected(app, client, request_args):
+    method, path, *body = request_args
+    assert getattr(client, method)(path, **({"json": body[0]} if body else {})).status_code == 400
@@ -0,0 +1,45 @@
+import json
+
+from sqlalchemy import insert, select
+
+import e_commerce_api_orm as api
+
+
+def products():
+    with api.app.app_context():
+        return {row.product_id: (row.name, row.price, row.stock_level) for row in api.db.session.execute(select(api.Product)).scalars()}
+
+
+def test_json_rows_are_inserted_and_upserted(app, client):
+    with app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 4}])
+    response = client.post("/products/bulk", json=[
+        {"name": "Shade", "price": 2.5, "stock_level": 3},
+        {"product_id": 1, "name": "Lamp", "price": 12.0}, # The stock level is left alone
+        {"name": "Broken", "price": -1},
+    ])
+    report = response.get_json()
+    assert (report["inserted"], report["upserted"], report["failed"]) == (1, 1, 1)
+    assert report["errors"][0]["row"] == 3 and "price" in report["errors"][0]["errors"]
+    assert products() == {1: ("Lamp", 12.0, 4), 2: ("Shade", 2.5, 3)}
+    assert client.get("/products/1").get_json()["price"] == 12.0 # The cached product was invalidated
+
+
+def test_ndjson_and_csv_bodies(app, client):
+    ndjson = "\n".join(json.dumps(row) for row in [{"name": "Lamp", "price": 10.0}, {"name": "Shade", "price": 2.5}]) + "\n\nnot json\n"
+    report = client.post("/products/bulk", data=ndjson, content_type="application/x-ndjson").get_json()
+    assert (report["inserted"], report["failed"], report["errors"][0]["row"]) == (2, 1, 4) # Rows are line numbers
+
+    csv = "product_id,name,price,stock_level\n2,Shade,3.0,\n,Brush,1.5,7\n"
+    report = client.post("/products/bulk", data=csv, content_type="text/csv").get_json()
+    assert (report["inserted"], report["upserted"], report["failed"]) == (1, 1, 0)
+    assert products() == {1: ("Lamp", 10.0, 0), 2: ("Shade", 3.0, 0), 3: ("Brush", 1.5, 7)} # An empty cell is a missing field
+
+
+def test_customers_are_validated_like_single_posts(app, client):
+    report = client.post("/customers/bulk", json=[{"name": "Ana", "email": "ana@example.com", "phone": "+15550000001"},
+                                                  {"name": "Bo", "email": "not-an-email", "phone": "+15550000002"}]).get_json()
+    assert (report["inserted"], report["failed"]) == (1, 1)
+    assert client.get("/customers/by-name?name=ana").get_json()["data"][0]["email"] == "ana@example.com" # Indexed for search
+    assert client.post("/customers/bulk", json={"name": "Ana"}).status_code == 400
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import e_commerce_api_orm as api
+
+
+@pytest.fixture
+def workers():
+    # Two worker processes sharing one store, as with Redis
+    shared = api.MemoryCache()
+    return api.CatalogCache(shared), api.CatalogCache(shared)
+
+
+def test_an_invalidation_reaches_every_worker(workers):
+    first, second = workers
+    first.set("product:1", {"body": "old"})
+    assert second.get("product:1") == {"body": "old"}
+    second.invalidate_products([1], catalog_changed=False)
+    assert first.get("product:1") is None
+
+
+def test_a_catalog_change_moves_every_worker_to_a_new_generation(workers):
+    first, second = workers
+    generation = first.generation()
+    second.invalidate_products([1])
+    assert first.generation() == generation + 1
+
+
+def test_generations_survive_eviction():
+    cache = api.CatalogCache(api.MemoryCache(max_entries=2))
+    cache.bump_generation()
+    for i in range(10):
+        cache.set(f"product:{i}", {"body": i})
+    assert cache.generation() == 1
+
+
+def test_workers_without_a_shared_store_dont_cache(app, client, monkeypatch):
+    monkeypatch.setattr(api, "catalog_cache", api.CatalogCache(api.MemoryCache()))
+    monkeypatch.setattr(api, "start_background_jobs", lambda: None)
+    api.init_worker(workers=4)
+    assert not api.catalog_cache.enabled
+    api.catalog_cache.set("product:1", {"body": "old"})
+    assert api.catalog_cache.get("product:1") is None
+
+
+def test_lookups_from_many_threads_are_all_counted():
+    cache = api.CatalogCache(api.MemoryCache())
+    cache.set("product:1", {"body": 1})
+
+    def lookups(_):
+        for _ in range(1000):
+            cache.get("product:1")
+            cache.get("product:2")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookups, range(8)))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (8000, 8000, 0.5)
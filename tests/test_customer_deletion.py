@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from sqlalchemy import func, insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed(statuses):
+    # Customer 1 has an account and one order per status, customer 2 one completed order. Orders are old enough to be archived
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": customer_id, "name": f"Customer {customer_id}", "email": f"c{customer_id}@example.com",
+                                                       "phone": f"+1555000000{customer_id}"} for customer_id in (1, 2)])
+            connection.execute(insert(api.CustomerAccount), [{"account_id": 1, "username": "customer1", "password": "pbkdf2:sha256:1$salt$hash", "customer_id": 1}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 10}])
+            orders = [{"order_id": order_id, "customer_id": 1, "date": api.datetime.date(2020, 1, order_id), "status": status}
+                      for order_id, status in enumerate(statuses, start=1)]
+            orders.append({"order_id": len(orders) + 1, "customer_id": 2, "date": api.datetime.date(2020, 2, 1), "status": "completed"})
+            connection.execute(insert(api.Order), orders)
+            connection.execute(insert(api.order_product), [{"order_id": order["order_id"], "product_id": 1, "quantity": 1, "unit_price": 10.0} for order in orders])
+            api.rebuild_customer_summaries(connection)
+
+
+def count(table, *where):
+    with api.app.app_context():
+        return api.db.session.scalar(select(func.count()).select_from(table).where(*where))
+
+
+def remaining_rows(customer_id):
+    return {
+        "orders": count(api.Order.__table__, api.Order.customer_id == customer_id) + count(api.ArchivedOrder.__table__, api.ArchivedOrder.customer_id == customer_id),
+        "accounts": count(api.CustomerAccount.__table__, api.CustomerAccount.customer_id == customer_id),
+        "summaries": count(api.customer_summary, api.customer_summary.c.customer_id == customer_id),
+        "customers": count(api.Customer.__table__, api.Customer.customer_id == customer_id),
+    }
+
+
+def test_deleting_a_customer_deletes_their_live_and_archived_orders(app, client):
+    seed(["completed", "canceled", "completed"])
+    assert client.post("/orders/archive", json={"after_days": 30}).get_json()["archived"] > 0 # Some of the orders are archived
+    assert client.delete("/customers/1").status_code == 200
+    assert remaining_rows(1) == {"orders": 0, "accounts": 0, "summaries": 0, "customers": 0}
+    assert count(api.order_product) + count(api.archived_order_product) == 1 # The line of customer 2's order
+    assert remaining_rows(2)["orders"] == 1
+    assert count(api.outbox_events, api.outbox_events.c.event_type == "order.deleted") == 3
+
+
+def test_customers_with_open_orders_or_none_at_all_are_not_deleted(app, client):
+    seed(["completed", "shipped"])
+    assert client.delete("/customers/1").status_code == 400
+    assert client.delete("/customers/1?background=true").status_code == 400
+    assert remaining_rows(1)["orders"] == 2
+    assert client.delete("/customers/99").status_code == 404
+
+
+@pytest.fixture
+def small_chunks(app):
+    chunk_size = app.config['CUSTOMER_DELETE_CHUNK_SIZE']
+    app.config['CUSTOMER_DELETE_CHUNK_SIZE'] = 2
+    yield
+    app.config['CUSTOMER_DELETE_CHUNK_SIZE'] = chunk_size
+
+
+def test_background_deletion_deletes_the_orders_in_chunks(app, client, small_chunks):
+    seed(["completed", "canceled", "completed", "canceled", "completed"])
+    response = client.delete("/customers/1?background=true")
+    assert response.status_code == 202
+    deadline = time.monotonic() + 5
+    while (progress := client.get(response.get_json()["status_url"]).get_json())["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (progress["status"], progress["deleted_orders"], progress["error"]) == ("done", 5, None)
+    assert remaining_rows(1) == {"orders": 0, "accounts": 0, "summaries": 0, "customers": 0}
+    assert remaining_rows(2)["orders"] == 1
@@ -0,0 +1,53 @@
+from sqlalchemy import insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": customer_id, "name": f"Customer {customer_id}", "email": f"c{customer_id}@example.com",
+                                                       "phone": f"+1555000000{customer_id}"} for customer_id in (1, 2)])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 100},
+                                                     {"product_id": 2, "name": "Shade", "price": 2.5, "stock_level": 100}])
+
+
+def place_order(client, customer_id, date, product_ids):
+    assert client.post("/orders", json={"customer_id": customer_id, "date": date, "product_ids": product_ids}).status_code == 201
+    return client.get(f"/customers/{customer_id}/orders").get_json()[-1]["order_id"]
+
+
+def summaries():
+    # Customers without counted orders have no row after a rebuild, and may have an empty one when maintained incrementally
+    with api.app.app_context():
+        rows = api.db.session.execute(select(api.customer_summary)).all()
+    return {row.customer_id: tuple(row)[1:] for row in rows if tuple(row)[1:] != (0, 0, None, 0)}
+
+
+def test_incremental_summaries_match_a_rebuild_after_mixed_changes(app, client):
+    seed()
+    first = place_order(client, 1, "2024-06-01", [1, 1, 2])
+    second = place_order(client, 1, "2024-06-05", [2])
+    third = place_order(client, 2, "2024-06-03", [1])
+    fourth = place_order(client, 2, "2024-06-07", [1, 2])
+    client.put(f"/orders/{second}", json={"customer_id": 2, "date": "2024-06-09", "product_ids": [2], "status": "shipped"}) # Moved to customer 2
+    client.put(f"/orders/{third}/cancel")
+    client.put(f"/orders/{fourth}", json={"customer_id": 2, "date": "2024-06-07", "product_ids": [1, 2], "status": "completed"})
+    client.delete(f"/orders/{first}")
+    place_order(client, 1, "2024-06-10", [2, 2])
+
+    incremental = summaries()
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            api.rebuild_customer_summaries(connection)
+    assert incremental == summaries()
+    assert incremental[2][:2] == (2, 15.0) # The moved and the completed order, not the canceled one
+
+
+def test_the_summary_endpoint(app, client):
+    seed()
+    place_order(client, 1, "2024-06-01", [1, 2])
+    order_id = place_order(client, 1, "2024-06-02", [1])
+    client.put(f"/orders/{order_id}/cancel")
+    summary = client.get("/customers/1/summary").get_json()
+    assert (summary["order_count"], summary["total_spent"], summary["last_order_date"], summary["open_orders"]) == (1, 12.5, "2024-06-01", 1)
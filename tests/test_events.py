@@ -0,0 +1,56 @@
+from sqlalchemy import func, insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 2}])
+
+
+def event_count():
+    with api.app.app_context():
+        return api.db.session.scalar(select(func.count()).select_from(api.outbox_events))
+
+
+def place_order(client, quantity):
+    return client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": [1] * quantity})
+
+
+def test_events_are_written_with_the_change_or_not_at_all(app, client):
+    seed()
+    assert place_order(client, 2).status_code == 201
+    events = client.get("/events").get_json()["events"]
+    assert [(event["type"], event["entity_id"]) for event in events] == [("order.created", 1), ("product.stock_changed", 1)]
+    assert events[1]["payload"] == {"adjustment": -2, "order_id": 1}
+
+    assert place_order(client, 1).status_code == 409 # Out of stock: the order is rolled back, and its events with it
+    assert event_count() == 2
+
+
+def test_the_feed_returns_deltas_after_a_position(app, client):
+    seed()
+    place_order(client, 1)
+    client.put("/orders/1/cancel")
+    first = client.get("/events?limit=2").get_json()
+    rest = client.get(f"/events?after={first['next_after']}").get_json()
+    assert [event["type"] for event in first["events"] + rest["events"]] == ["order.created", "product.stock_changed", "product.stock_changed", "order.canceled"]
+    assert client.get(f"/events?after={rest['next_after']}").get_json() == {"events": [], "next_after": rest["next_after"]}
+    assert [event["type"] for event in client.get("/events?entity=order").get_json()["events"]] == ["order.created", "order.canceled"]
+    assert client.get("/events?entity=customer").status_code == 400
+
+
+def test_compaction_keeps_what_a_consumer_has_not_acknowledged(app, client):
+    seed()
+    place_order(client, 1)
+    client.put("/orders/1/cancel")
+    client.get("/events?consumer=mailer&after=2")
+    assert client.get("/events/consumers").get_json()[0]["lag"] == 2
+    with app.app_context():
+        assert api.compact_events(batch_size=1) == 2
+    assert [event["event_id"] for event in client.get("/events").get_json()["events"]] == [3, 4]
+
+    assert client.delete("/events/consumers/mailer").status_code == 200
+    assert client.delete("/events/consumers/mailer").status_code == 404
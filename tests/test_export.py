@@ -0,0 +1,55 @@
+import csv
+import datetime
+import io
+import json
+
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    old, new = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 6, 25, 12)
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": product_id, "name": f"Product {product_id}", "price": 1.5, "stock_level": 2,
+                                                      "updated_at": old if product_id < 4 else new} for product_id in range(1, 6)])
+            connection.execute(insert(api.Order), [{"order_id": 1, "customer_id": 1, "date": datetime.date(2024, 6, 25), "status": "pending"}])
+            connection.execute(insert(api.order_product), [{"order_id": 1, "product_id": 2, "quantity": 3, "unit_price": 1.5},
+                                                           {"order_id": 1, "product_id": 1, "quantity": 1, "unit_price": 1.5}])
+
+
+def test_ndjson_streams_every_row_in_batches(app, client, monkeypatch):
+    seed()
+    monkeypatch.setattr(api, "EXPORT_BATCH_SIZE", 2)
+    response = client.get("/products/export")
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["product_id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["name"] == "Product 1" and rows[0]["updated_at"] == "2024-01-01T00:00:00"
+
+
+def test_csv_has_a_header_and_the_same_rows(app, client):
+    seed()
+    response = client.get("/products/export?format=csv")
+    assert response.headers["Content-Disposition"] == "attachment; filename=products.csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["product_id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows[3]["name"] == "Product 4" and rows[3]["updated_at"] == "2024-06-25T12:00:00"
+
+
+def test_updated_since_only_exports_changed_rows(app, client):
+    seed()
+    for since in ("2024-06-01T00:00:00", "2024-06-01T02:00:00%2B02:00"):
+        lines = client.get(f"/products/export?updated_since={since}").get_data(as_text=True).splitlines()
+        assert [json.loads(line)["product_id"] for line in lines] == [4, 5]
+    assert client.get("/products/export?updated_since=yesterday").status_code == 400
+    assert client.get("/products/export?format=xml").status_code == 400
+
+
+def test_orders_include_their_lines(app, client):
+    seed()
+    order = json.loads(client.get("/orders/export").get_data(as_text=True))
+    assert order["products"] == [{"product_id": 1, "quantity": 1, "unit_price": 1.5}, {"product_id": 2, "quantity": 3, "unit_price": 1.5}]
+    assert "products" not in client.get("/orders/export?format=csv").get_data(as_text=True).splitlines()[0]
@@ -0,0 +1,55 @@
+import datetime
+import types
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+
+import e_commerce_api_orm as api
+
+
+@pytest.fixture
+def seeded(app):
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [
+                {"customer_id": 1, "name": "Ana", "email": "ana@example.com", "phone": "+15550000001"},
+                {"customer_id": 2, "name": "Bø Ürban", "email": "bo@example.com", "phone": "+15550000002"}])
+            connection.execute(insert(api.Product), [
+                {"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 3, "reorder_point": None, "reorder_quantity": None},
+                {"product_id": 2, "name": "Shade", "price": 0.1 + 0.2, "stock_level": 0, "reorder_point": 2, "reorder_quantity": 5}])
+            connection.execute(insert(api.Order), [
+                {"order_id": 1, "customer_id": 1, "date": datetime.date(2024, 6, 25), "status": "pending"},
+                {"order_id": 2, "customer_id": 2, "date": datetime.date(2024, 6, 26), "status": "completed"}])
+            connection.execute(insert(api.order_product), [
+                {"order_id": 1, "product_id": 1, "quantity": 1, "unit_price": 10.0},
+                {"order_id": 1, "product_id": 2, "quantity": 2, "unit_price": 0.3},
+                {"order_id": 2, "product_id": 1, "quantity": 1, "unit_price": 10.0}])
+
+
+@pytest.mark.parametrize("path, model, schema, fields", [
+    ("/customers", api.Customer, api.customers_schema, None),
+    ("/customers", api.Customer, api.customers_schema, ("name", "phone")),
+    ("/products", api.Product, api.products_schema, None),
+    ("/products", api.Product, api.products_schema, ("name", "price")),
+    ("/orders", api.Order, api.orders_schema, None),
+    ("/orders", api.Order, api.orders_schema, ("date", "status")),
+])
+def test_the_fast_path_returns_the_bytes_of_the_schema(seeded, client, path, model, schema, fields):
+    query = f"?fields={','.join(fields)}" if fields else ""
+    fast = client.get(path + query).get_data()
+    with api.app.test_request_context(path + query):
+        rows = api.db.session.execute(select(model).order_by(*model.__mapper__.primary_key)).scalars().all()
+        page_schema = schema.__class__(many=True, only=fields) if fields else schema
+        assert fast == api.jsonify({"data": page_schema.dump(rows), "next_cursor": None}).get_data()
+
+
+def test_the_dumpers_format_values_like_marshmallow():
+    # Decimal is what a NUMERIC column or a MySQL driver can return for a float field, and None a NULL column
+    names, dumpers = api.row_fields(api.products_schema.__class__, None)
+    products = [{"product_id": 1, "name": "Lamp", "price": Decimal("10.50"), "stock_level": None},
+                {"product_id": 2, "name": "Shade", "price": 0.1 + 0.2, "stock_level": 7}]
+    rows = [tuple(product[name] for name in names) for product in products]
+    expected = api.products_schema.dump([types.SimpleNamespace(**product) for product in products])
+    assert api.dump_rows(names, dumpers, rows) == expected
+    assert api.compact_json_encoder.encode(api.dump_rows(names, dumpers, rows)) == api.compact_json_encoder.encode(expected)
@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+import json
+
+from sqlalchemy import func, insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed_product():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 10}])
+
+
+def claim_key(key, committed, locked_for, body=""):
+    # A row as left by a request running in (or crashed in) another worker process
+    now = api.utcnow()
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.idempotency_keys).values(
+                key=f"/orders:{key}", fingerprint=hashlib.sha256(body.encode()).hexdigest(), committed=committed, locked_until=now + datetime.timedelta(seconds=locked_for), created_at=now))
+
+
+def order_count():
+    with api.app.app_context():
+        return api.db.session.scalar(select(func.count()).select_from(api.Order))
+
+
+ORDER = {"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}
+
+
+def test_a_retry_replays_the_stored_response(app, client):
+    seed_product()
+    first = client.post("/orders", json=ORDER, headers={"Idempotency-Key": "a"})
+    retry = client.post("/orders", json=ORDER, headers={"Idempotency-Key": "a"})
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert order_count() == 1
+    assert client.post("/orders", json={**ORDER, "product_ids": [1, 1]}, headers={"Idempotency-Key": "a"}).status_code == 422
+
+
+def test_a_key_running_in_another_worker_is_not_run_again(app, client):
+    seed_product()
+    claim_key("b", committed=False, locked_for=60)
+    response = client.post("/orders", json=ORDER, headers={"Idempotency-Key": "b"})
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert order_count() == 0
+
+
+def test_a_key_whose_owner_died_before_committing_is_taken_over(app, client):
+    seed_product()
+    claim_key("c", committed=False, locked_for=-1)
+    assert client.post("/orders", json=ORDER, headers={"Idempotency-Key": "c"}).status_code == 201
+    assert order_count() == 1
+
+
+def test_a_key_whose_owner_committed_is_never_run_again(app, client):
+    seed_product()
+    body = json.dumps(ORDER)
+    claim_key("d", committed=True, locked_for=-1, body=body)
+    assert client.post("/orders", data=body, content_type="application/json", headers={"Idempotency-Key": "d"}).status_code == 409
+    assert order_count() == 0
+
+
+def test_the_key_is_marked_in_the_transaction_of_the_request(app, client):
+    seed_product()
+    client.post("/orders", json=ORDER, headers={"Idempotency-Key": "e"})
+    with app.app_context():
+        row = api.idempotency_store.get("/orders:e")
+    assert (row.committed, row.status) == (True, 201)
+
+
+def test_the_database_claim_runs_outside_the_process_lock(app, monkeypatch):
+    store = api.IdempotencyStore()
+    locked = []
+    monkeypatch.setattr(store, "claim", lambda key, fingerprint: locked.append(store.lock.locked()) or False)
+    with app.app_context():
+        assert store.begin("/orders:e", "fingerprint") == (False, None)
+    assert locked == [False]
+    assert store.in_flight == {} # Freed again, since the key wasn't claimed
+
+
+def test_duplicates_in_the_same_process_wait_for_the_owner(app):
+    store = api.IdempotencyStore()
+    with app.app_context():
+        assert store.begin("/orders:f", "fingerprint") == (True, None)
+        owner, event = store.begin("/orders:f", "fingerprint")
+        assert not owner and not event.is_set()
+        store.finish("/orders:f", None)
+    assert event.is_set()
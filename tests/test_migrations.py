@@ -0,0 +1,53 @@
+import sqlalchemy
+from sqlalchemy import text
+from werkzeug.security import check_password_hash
+
+import e_commerce_api_orm as api
+
+# The schema that the first release created with db.create_all() (and online_shopping.sql), before any migration
+BASELINE_SCHEMA = [
+    """CREATE TABLE "Customers" (customer_id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL,
+                                 email VARCHAR(320) NOT NULL, phone VARCHAR(15) NOT NULL)""",
+    """CREATE TABLE "Customer_Accounts" (account_id INTEGER NOT NULL PRIMARY KEY, username VARCHAR(255) NOT NULL UNIQUE,
+                                         password VARCHAR(255) NOT NULL, customer_id INTEGER NOT NULL REFERENCES "Customers" (customer_id))""",
+    """CREATE TABLE "Orders" (order_id INTEGER NOT NULL PRIMARY KEY, date DATE NOT NULL,
+                              customer_id INTEGER NOT NULL REFERENCES "Customers" (customer_id), status VARCHAR(50) NOT NULL)""",
+    """CREATE TABLE "Products" (product_id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, price FLOAT NOT NULL,
+                                stock_level INTEGER NOT NULL)""",
+    """CREATE TABLE "Order_Product" (order_id INTEGER NOT NULL REFERENCES "Orders" (order_id),
+                                     product_id INTEGER NOT NULL REFERENCES "Products" (product_id), PRIMARY KEY (order_id, product_id))""",
+]
+
+BASELINE_ROWS = [
+    """INSERT INTO "Customers" VALUES (1, 'Ana', 'ana@example.com', '+15550000001')""",
+    """INSERT INTO "Customer_Accounts" VALUES (1, 'ana', 'plain-text', 1)""",
+    """INSERT INTO "Products" VALUES (1, 'Lamp', 10.0, 5), (2, 'Shade', 2.5, 0)""",
+    """INSERT INTO "Orders" VALUES (1, '2024-06-25', 1, 'pending'), (2, '2024-06-26', 1, 'canceled')""",
+    """INSERT INTO "Order_Product" VALUES (1, 1), (1, 2), (2, 1)""",
+]
+
+
+def test_a_baseline_database_is_upgraded_through_every_migration(app, tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA + BASELINE_ROWS:
+            connection.execute(text(statement))
+
+    with app.app_context():
+        assert api.upgrade_schema(engine) == [version for version, _, _ in api.MIGRATIONS]
+        assert api.upgrade_schema(engine) == [] # Nothing left to apply
+
+    with engine.connect() as connection:
+        versions = connection.scalars(text('SELECT version FROM "Schema_Version" ORDER BY version')).all()
+        assert versions == [version for version, _, _ in api.MIGRATIONS]
+        assert connection.execute(text('SELECT product_id, name, price, stock_level FROM "Products" ORDER BY product_id')).all() == [
+            (1, "Lamp", 10.0, 5), (2, "Shade", 2.5, 0)]
+        assert connection.execute(text('SELECT order_id, status FROM "Orders" ORDER BY order_id')).all() == [(1, "pending"), (2, "canceled")]
+        # The lines get the quantity and unit price that the totals are computed from
+        assert connection.execute(text('SELECT order_id, product_id, quantity, unit_price FROM "Order_Product" ORDER BY order_id, product_id')).all() == [
+            (1, 1, 1, 10.0), (1, 2, 1, 2.5), (2, 1, 1, 10.0)]
+        username, password = connection.execute(text('SELECT username, password FROM "Customer_Accounts"')).one()
+        assert username == "ana" and check_password_hash(password, "plain-text") # Hashed by migration 7
+        summary = connection.execute(text('SELECT order_count, total_spent, open_orders FROM "Customer_Summary" WHERE customer_id = 1')).one()
+        assert tuple(summary) == (1, 12.5, 1) # The canceled order doesn't count
+    engine.dispose()
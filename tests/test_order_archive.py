@@ -0,0 +1,66 @@
+import datetime
+
+from sqlalchemy import func, insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    # Orders 1-3 are old: completed, canceled and pending. Order 4 is recent and completed, order 5 is the newest
+    old, recent = datetime.date(2020, 1, 1), api.utcnow().date()
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 10},
+                                                     {"product_id": 2, "name": "Shade", "price": 2.5, "stock_level": 10}])
+            connection.execute(insert(api.Order), [{"order_id": order_id, "customer_id": 1, "date": date, "status": status} for order_id, date, status in
+                                                   [(1, old, "completed"), (2, old, "canceled"), (3, old, "pending"), (4, recent, "completed"), (5, old, "completed")]])
+            connection.execute(insert(api.order_product), [{"order_id": order_id, "product_id": product_id, "quantity": quantity, "unit_price": unit_price}
+                                                           for order_id in range(1, 6) for product_id, quantity, unit_price in [(1, 2, 9.0), (2, 1, 2.5)]])
+            api.rebuild_customer_summaries(connection)
+
+
+def archive(client):
+    return client.post("/orders/archive", json={"after_days": 30}).get_json()["archived"]
+
+
+def archived_ids():
+    with api.app.app_context():
+        return api.db.session.scalars(select(api.ArchivedOrder.order_id).order_by(api.ArchivedOrder.order_id)).all()
+
+
+def test_only_old_closed_orders_are_archived(app, client):
+    seed()
+    assert archive(client) == 2
+    assert archived_ids() == [1, 2] # Not the pending, the recent or the newest order
+    assert archive(client) == 0
+
+
+def test_archived_orders_keep_their_lines_and_totals(app, client):
+    seed()
+    before = {order_id: (client.get(f"/orders/{order_id}").get_json(), client.get(f"/orders/{order_id}/products").get_json(),
+                         client.get(f"/orders/{order_id}/total").get_json()) for order_id in (1, 2)}
+    summary = client.get("/customers/1/summary").get_json()
+    archive(client)
+    after = {order_id: (client.get(f"/orders/{order_id}").get_json(), client.get(f"/orders/{order_id}/products").get_json(),
+                        client.get(f"/orders/{order_id}/total").get_json()) for order_id in (1, 2)}
+    assert after == before
+    assert before[1][2]["total_price"] == 20.5
+    assert client.get("/customers/1/summary").get_json() == summary
+    assert sorted(order["order_id"] for order in client.get("/customers/1/orders").get_json()) == [1, 2, 3, 4, 5]
+    assert sorted(order["order_id"] for order in client.get("/customers/1/orders?include_archived=false").get_json()) == [3, 4, 5]
+    assert client.post("/orders/totals", json={"order_ids": [1, 4]}).get_json() == {"totals": [{"order_id": 1, "total_price": 20.5}, {"order_id": 4, "total_price": 20.5}], "missing": []}
+
+
+def test_archived_orders_can_be_deleted_but_not_changed(app, client):
+    seed()
+    archive(client)
+    body = {"customer_id": 1, "date": "2020-01-01", "product_ids": [1], "status": "pending"}
+    assert client.put("/orders/1", json=body).status_code == 409
+    assert client.put("/orders/2/cancel").status_code == 409
+    assert client.delete("/orders/1").status_code == 200
+    assert client.get("/orders/1").status_code == 404
+    assert archived_ids() == [2]
+    with app.app_context():
+        assert api.db.session.scalar(select(func.count()).select_from(api.archived_order_product).where(api.archived_order_product.c.order_id == 1)) == 0
+    assert client.get("/products/1/stock").get_json()["stock_level"] == 10 # A completed order keeps the stock it shipped
@@ -0,0 +1,54 @@
+import datetime
+
+import pytest
+from sqlalchemy import event, insert
+
+import e_commerce_api_orm as api
+
+
+def seed_orders(orders, products_per_order=3):
+    # One customer with the given number of orders, each with several products
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": i, "name": f"Product {i}", "price": 10.0 + i, "stock_level": 100}
+                                                     for i in range(1, products_per_order + 1)])
+            connection.execute(insert(api.Order), [{"order_id": i, "customer_id": 1, "date": datetime.date(2024, 1, 1), "status": "pending"}
+                                                   for i in range(1, orders + 1)])
+            connection.execute(insert(api.order_product), [{"order_id": order_id, "product_id": product_id, "quantity": 1, "unit_price": 10.0 + product_id}
+                                                           for order_id in range(1, orders + 1) for product_id in range(1, products_per_order + 1)])
+
+
+def count_statements(client, path):
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with api.app.app_context():
+        engine = api.db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.get_json()
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", ["/orders?limit=100", "/customers/1/orders"])
+def test_order_lists_issue_a_constant_number_of_queries(app, client, path):
+    counts = []
+    for orders in (5, 50):
+        with app.app_context():
+            api.db.drop_all()
+            api.upgrade_schema(api.db.engine)
+        seed_orders(orders)
+        counts.append(count_statements(client, path))
+    assert counts[0] == counts[1]
+
+
+def test_order_lists_include_every_product(app, client):
+    seed_orders(10, products_per_order=4)
+    orders = client.get("/customers/1/orders").get_json()
+    assert len(orders) == 10
+    assert all(len(order["products"]) == 4 for order in orders)
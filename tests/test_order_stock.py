@@ -0,0 +1,74 @@
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+
+def seed_product(stock_level):
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": stock_level}])
+
+
+def stock_level(client):
+    return client.get("/products/1/stock").get_json()["stock_level"]
+
+
+def place_order(client, quantity):
+    response = client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": [1] * quantity})
+    assert response.status_code == 201
+    return client.get("/customers/1/orders").get_json()[-1]["order_id"]
+
+
+def test_canceling_an_order_gives_its_stock_back_once(app, client):
+    seed_product(3)
+    order_id = place_order(client, 2)
+    assert stock_level(client) == 1
+    assert client.put(f"/orders/{order_id}/cancel").status_code == 200
+    assert stock_level(client) == 3
+    assert client.put(f"/orders/{order_id}/cancel").status_code == 200
+    assert stock_level(client) == 3
+
+
+def test_deleting_an_order_gives_its_stock_back_unless_canceled(app, client):
+    seed_product(3)
+    order_id = place_order(client, 2)
+    assert client.delete(f"/orders/{order_id}").status_code == 200
+    assert stock_level(client) == 3
+
+    order_id = place_order(client, 2)
+    client.put(f"/orders/{order_id}/cancel")
+    assert client.delete(f"/orders/{order_id}").status_code == 200
+    assert stock_level(client) == 3
+
+
+def test_reopening_a_canceled_order_takes_its_stock_again(app, client):
+    seed_product(3)
+    order_id = place_order(client, 2)
+    body = {"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}
+    assert client.put(f"/orders/{order_id}", json={**body, "status": "canceled"}).status_code == 200
+    assert stock_level(client) == 3
+    place_order(client, 2)
+    assert client.put(f"/orders/{order_id}", json={**body, "status": "pending"}).status_code == 409 # Only 1 left
+    assert stock_level(client) == 1
+
+
+def test_deleting_a_completed_order_keeps_the_stock_it_shipped(app, client):
+    seed_product(3)
+    order_id = place_order(client, 2)
+    body = {"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}
+    assert client.put(f"/orders/{order_id}", json={**body, "status": "completed"}).status_code == 200
+    assert client.delete(f"/orders/{order_id}").status_code == 200
+    assert stock_level(client) == 1
+
+
+def test_shipped_and_completed_orders_cant_be_canceled_by_an_update(app, client):
+    seed_product(3)
+    order_id = place_order(client, 2)
+    body = {"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}
+    for status in ("shipped", "completed"):
+        assert client.put(f"/orders/{order_id}", json={**body, "status": status}).status_code == 200
+        response = client.put(f"/orders/{order_id}", json={**body, "status": "canceled"})
+        assert response.status_code == 400
+        assert response.get_json() == client.put(f"/orders/{order_id}/cancel").get_json()
+        assert stock_level(client) == 1
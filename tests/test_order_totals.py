@@ -0,0 +1,37 @@
+from sqlalchemy import insert, select
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 10},
+                                                     {"product_id": 2, "name": "Shade", "price": 2.5, "stock_level": 10}])
+
+
+def place_order(client, product_ids):
+    assert client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": product_ids}).status_code == 201
+    return client.get("/customers/1/orders").get_json()[-1]["order_id"]
+
+
+def test_lines_store_the_quantity_and_the_price_paid(app, client):
+    seed()
+    order_id = place_order(client, [1, 2, 1, 1])
+    with app.app_context():
+        lines = api.db.session.execute(select(api.order_product.c.product_id, api.order_product.c.quantity, api.order_product.c.unit_price)
+                                       .where(api.order_product.c.order_id == order_id).order_by(api.order_product.c.product_id)).all()
+    assert [tuple(line) for line in lines] == [(1, 3, 10.0), (2, 1, 2.5)]
+    assert client.get("/products/1/stock").get_json()["stock_level"] == 7
+
+
+def test_totals_use_the_price_at_the_time_of_purchase(app, client):
+    seed()
+    first = place_order(client, [1, 1, 2])
+    assert client.put("/products/1", json={"name": "Lamp", "price": 99.0}).status_code == 200
+    second = place_order(client, [1])
+    assert client.get(f"/orders/{first}/total").get_json() == {"order_id": first, "total_price": 22.5}
+    assert client.post("/orders/totals", json={"order_ids": [second, first, 404]}).get_json() == {
+        "totals": [{"order_id": second, "total_price": 99.0}, {"order_id": first, "total_price": 22.5}], "missing": [404]}
+    assert client.get("/orders/404/total").status_code == 404
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+
+def seed_products(ids):
+    # Every product has the same name and price, so only the primary key orders them
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Product), [{"product_id": product_id, "name": "Lamp", "price": 10.0, "stock_level": 1} for product_id in ids])
+
+
+def all_pages(client, path):
+    ids, url = [], path
+    while True:
+        body = client.get(url).get_json()
+        ids.extend(product["product_id"] for product in body["data"])
+        if body["next_cursor"] is None:
+            return ids
+        url = f"{path}&after={body['next_cursor']}"
+
+
+def test_pages_cover_every_row_once_in_key_order(app, client):
+    seed_products(range(1, 12))
+    assert all_pages(client, "/products?limit=3") == list(range(1, 12))
+
+
+def test_rows_inserted_before_the_cursor_dont_shift_the_next_page(app, client):
+    seed_products([2, 4, 6, 8])
+    first = client.get("/products?limit=2").get_json()
+    seed_products([1, 3]) # Before the cursor: an offset would now return product 4 again
+    second = client.get(f"/products?limit=2&after={first['next_cursor']}").get_json()
+    assert [product["product_id"] for product in second["data"]] == [6, 8]
+    assert second["next_cursor"] is None
+
+
+def test_projection_returns_only_the_requested_fields(app, client):
+    seed_products([1, 2])
+    body = client.get("/products?fields=name,price&limit=1").get_json()
+    assert body["data"] == [{"name": "Lamp", "price": 10.0}]
+    assert client.get(f"/products?fields=name&after={body['next_cursor']}").get_json() == {"data": [{"name": "Lamp"}], "next_cursor": None}
+
+
+@pytest.mark.parametrize("query", ["after=not-a-cursor", "after=eyJ4IjogMX0=", "limit=0", "limit=501", "fields=password", "fields=orders"])
+def test_bad_page_arguments_are_rejected(app, client, query):
+    for path in ("/customers", "/products", "/orders", "/accounts"):
+        assert client.get(f"{path}?{query}").status_code == 400, path
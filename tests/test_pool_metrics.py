@@ -0,0 +1,34 @@
+import pytest
+import sqlalchemy
+
+import e_commerce_api_orm as api
+
+
+def test_requests_are_counted(app, client):
+    before = client.get("/metrics/pool").get_json()
+    client.get("/products")
+    after = client.get("/metrics/pool").get_json()
+    assert after["checkouts"] > before["checkouts"]
+    assert after["checkins"] - before["checkins"] == after["checkouts"] - before["checkouts"] # Every connection was returned
+    assert {"pool_class", "status", "invalidations", "timeouts", "waits", "total_wait_seconds", "max_wait_seconds"} <= set(after)
+
+
+def test_invalidated_connections_are_counted(app):
+    with app.app_context():
+        before = api.pool_metrics.invalidations
+        with api.db.engine.connect() as connection:
+            connection.invalidate()
+        assert api.pool_metrics.invalidations == before + 1
+
+
+def test_checkouts_that_wait_too_long_are_counted(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=api.MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    before = api.pool_metrics.as_dict()
+    with engine.connect():
+        with pytest.raises(sqlalchemy.exc.TimeoutError):
+            engine.connect()
+    after = api.pool_metrics.as_dict()
+    assert after["timeouts"] == before["timeouts"] + 1
+    assert after["waits"] == before["waits"] + 1
+    assert after["max_wait_seconds"] >= 0.05
+    engine.dispose()
@@ -0,0 +1,35 @@
+import pytest
+
+import e_commerce_api_orm as api
+
+
+@pytest.fixture
+def started(monkeypatch):
+    # Records the schedulers that prepare_app() starts, instead of starting them
+    started = []
+    monkeypatch.setattr(api, "background_jobs_started", False)
+    monkeypatch.setattr(api, "BACKGROUND_JOBS", [("RESTOCK_INTERVAL", started.append)])
+    monkeypatch.setitem(api.app.config, "RESTOCK_INTERVAL", 60)
+    monkeypatch.delenv("WERKZEUG_RUN_MAIN", raising=False)
+    monkeypatch.delenv("FLASK_DEBUG", raising=False)
+    return started
+
+
+def test_jobs_start_once_per_process(started):
+    api.prepare_app()
+    api.prepare_app()
+    assert started == [60]
+
+
+def test_reloader_parent_starts_no_jobs(started, monkeypatch):
+    monkeypatch.setenv("FLASK_DEBUG", "1")
+    api.prepare_app()
+    assert started == []
+    monkeypatch.setenv("WERKZEUG_RUN_MAIN", "true") # The reloaded child
+    api.prepare_app()
+    assert started == [60]
+
+
+def test_importing_starts_no_jobs(started):
+    assert api.prepare_app(start_jobs=False) is api.app
+    assert started == []
@@ -0,0 +1,55 @@
+import re
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import OperationalError
+
+import e_commerce_api_orm as api
+
+pytestmark = pytest.mark.skipif(not api.app.config['PROFILING'], reason="PROFILING is off")
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 1}])
+
+
+def test_responses_carry_server_timing(app, client):
+    seed()
+    header = client.get("/products/1/stock").headers["Server-Timing"]
+    assert re.fullmatch(r'total;dur=[\d.]+, db;dur=[\d.]+;desc="1 statements, \d+ rows", serialize;dur=[\d.]+', header)
+
+
+def test_requests_are_aggregated_per_endpoint(app, client):
+    seed()
+    before = client.get("/metrics/requests").get_json()["endpoints"].get("get_products", {"requests": 0})["requests"]
+    for _ in range(3):
+        client.get("/products")
+    stats = client.get("/metrics/requests").get_json()["endpoints"]["get_products"]
+    assert stats["requests"] == before + 3
+    assert sum(stats["histogram"].values()) == stats["requests"]
+    assert stats["max_statements"] >= 1
+
+
+def test_slow_statements_are_recorded(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILING_SLOW_QUERY_MS', 0)
+    client.get("/products")
+    slowest = client.get("/metrics/requests").get_json()["slowest_queries"]
+    assert any(query["endpoint"] == "get_products" and "Products" in query["statement"] for query in slowest)
+
+
+def test_a_failed_statement_doesnt_break_the_next_one(app):
+    with app.app_context():
+        with api.db.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+            assert "query_start" not in connection.info
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    stats = api.EndpointStats()
+    for wall_ms in [1] * 90 + [30] * 9 + [6000]:
+        stats.record(wall_ms, api.RequestProfile())
+    assert (stats.percentile(0.5), stats.percentile(0.95), stats.percentile(0.99), stats.percentile(1)) == (5, 50, 50, 6000)
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+import e_commerce_api_orm as api
+
+
+def seed():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Product), [
+                {"product_id": product_id, "name": name, "price": 1.0, "stock_level": stock_level, "reorder_point": reorder_point, "reorder_quantity": reorder_quantity}
+                for product_id, name, stock_level, reorder_point, reorder_quantity in [
+                    (1, "Low", 4, None, None), # Below the default low level of 5
+                    (2, "Fine", 5, None, None),
+                    (3, "Own point", 9, 10, 50),
+                    (4, "Own point, fine", 2, 2, None),
+                    (5, "Never", 0, 0, None),
+                ]])
+
+
+def stock_levels(client):
+    return {product_id: client.get(f"/products/{product_id}/stock").get_json()["stock_level"] for product_id in range(1, 6)}
+
+
+def test_products_below_their_reorder_point_are_restocked(app, client):
+    seed()
+    response = client.post("/products/restock", json={})
+    assert response.get_json()["product_ids"] == [1, 3]
+    assert stock_levels(client) == {1: 24, 2: 5, 3: 59, 4: 2, 5: 0}
+    log = client.get("/products/restock/log").get_json()["data"]
+    assert sorted((entry["product_id"], entry["quantity"], entry["source"]) for entry in log) == [(1, 20, "api"), (3, 50, "api")]
+    assert client.post("/products/restock", json={}).get_json() == {"message": "No products need restocking"}
+
+
+def test_the_global_thresholds_can_be_overridden(app, client):
+    seed()
+    assert client.post("/products/restock", json={"low_level": 6, "restock_amount": 1}).get_json()["product_ids"] == [1, 2, 3]
+    assert stock_levels(client)[2] == 6
+    assert client.post("/products/restock", json={"restock_amount": 0}).status_code == 400
+
+
+def test_the_cli_command_logs_scheduler_restocks(app, client):
+    seed()
+    assert "2 products restocked" in app.test_cli_runner().invoke(args=["restock"]).output
+    assert {entry["source"] for entry in client.get("/products/restock/log").get_json()["data"]} == {"scheduler"}
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning") # The SystemExit that stops the thread
+def test_the_scheduler_keeps_running_after_a_failed_check(app, monkeypatch):
+    calls = []
+
+    def restock(source):
+        calls.append(source)
+        if len(calls) == 1:
+            raise SQLAlchemyError("database unavailable")
+        raise SystemExit # Ends the scheduler thread
+
+    monkeypatch.setattr(api, "restock_low_products", restock)
+    thread = api.start_restock_scheduler(0.01)
+    thread.join(5)
+    assert not thread.is_alive()
+    assert calls == ["scheduler", "scheduler"]
@@ -0,0 +1,29 @@
+from sqlalchemy import insert
+
+import e_commerce_api_orm as api
+
+
+def seed_product():
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(insert(api.Customer), [{"customer_id": 1, "name": "Customer", "email": "customer@example.com", "phone": "+15550000001"}])
+            connection.execute(insert(api.Product), [{"product_id": 1, "name": "Lamp", "price": 10.0, "stock_level": 10}])
+
+
+def test_orders_dont_change_the_product_version(app, client):
+    seed_product()
+    etag = client.get("/products/1").headers["ETag"]
+    stock_etag = client.get("/products/1/stock").headers["ETag"]
+    assert client.post("/orders", json={"customer_id": 1, "date": "2024-06-25", "product_ids": [1]}).status_code == 201
+
+    assert client.get("/products/1").headers["ETag"] == etag
+    assert client.get("/products/1/stock").headers["ETag"] != stock_etag
+    assert client.put("/products/1", json={"price": 12.0}, headers={"If-Match": etag}).status_code == 200
+    assert client.put("/products/1/stock", json={"adjustment": 1}, headers={"If-Match": stock_etag}).status_code == 412
+
+
+def test_stock_fields_change_the_stock_version(app, client):
+    seed_product()
+    stock_etag = client.get("/products/1/stock").headers["ETag"]
+    assert client.put("/products/1", json={"reorder_point": 3}).status_code == 200
+    assert client.get("/products/1/stock").headers["ETag"] != stock_etag
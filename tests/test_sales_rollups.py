@@ -0,0 +1,23 @@
+from sqlalchemy import delete, select
+
+import e_commerce_api_orm as api
+
+
+def test_first_refresh_is_full_and_later_ones_incremental(app):
+    with app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(delete(api.RollupState))
+        for expected_full in (True, False):
+            with api.db.engine.begin() as connection:
+                assert api.refresh_sales_rollups(connection) is expected_full
+
+
+def test_state_row_exists_before_the_first_refresh_locks_it(app):
+    # A concurrent first refresh inserts nothing when the row is already there
+    with app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(delete(api.RollupState))
+            api.create_rollup_state(connection, "sales")
+            api.create_rollup_state(connection, "sales")
+            assert api.refresh_sales_rollups(connection) is True
+            assert connection.scalar(select(api.RollupState.refreshed_at)) != api.NEVER_REFRESHED
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import e_commerce_api_orm as api
+
+
+NAMES = {1: "Shoe Polish", 2: "Shoe Rack", 3: "Shoehorn", 4: "Brush", 5: "Polish Remover"}
+
+
+def test_search_returns_the_best_matches_first():
+    index = api.TrigramIndex(lambda: NAMES.items())
+    assert index.search("shoe", 2) == [2, 1]
+    assert index.search("shoo polish", 10)[0] == 1
+
+
+def test_search_scores_a_bounded_number_of_names():
+    index = api.TrigramIndex(lambda: ((i, f"Shoe {i}") for i in range(1, 1001)), max_candidates=50)
+    assert len(index.search("shoe", 1000)) == 50
+
+
+def test_changes_made_during_a_build_are_kept():
+    def load_documents():
+        yield 1, "Shoe Polish"
+        index.add(2, "Shoe Rack") # Committed after the build read its rows
+        index.remove(1)
+
+    index = api.TrigramIndex(load_documents)
+    index.build()
+    assert index.search("shoe", 10) == [2]
+
+
+def test_an_expired_index_is_rebuilt_in_the_background(app):
+    names, loaded = dict(NAMES), threading.Event()
+    loaded.set()
+
+    def load_documents():
+        loaded.wait()
+        return list(names.items())
+
+    index = api.TrigramIndex(load_documents)
+    index.build()
+    loaded.clear() # Holding the next build until the index was searched
+    names[6] = "Shoe Tree" # Written by a bulk import
+    index.invalidate()
+    assert 6 not in index.search("shoe", 10) # Served from the current index while the new one is built
+    loaded.set()
+    deadline = time.monotonic() + 5
+    while index.building and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 6 in index.search("shoe", 10)
+
+
+def test_search_pages(client):
+    for name in NAMES.values():
+        client.post("/products", json={"name": name, "price": 1.0})
+    everything = client.get("/products/by-name?name=shoe").get_json()
+    first = client.get("/products/by-name?name=shoe&limit=2").get_json()
+    second = client.get(f"/products/by-name?name=shoe&limit=2&after={first['next_cursor']}").get_json()
+    assert len(everything["data"]) == 3
+    assert first["data"] + second["data"] == everything["data"]
+    assert second["next_cursor"] is None